@@ -41,7 +41,7 @@ def delete_all_github_repos(ctx, param, value):
         try:
             token = click.prompt('Enter GitHub token with admin access', hide_input=True)
             github = GitHubClient(token)
-            repos = github.get_all_repos()
+            repos = list(github.get_all_repos())
             if len(repos) == 0:
                 print(f'There are no repositories to delete for login {github.login}.')
                 return
@@ -1,7 +1,9 @@
+import os
 import random
 import pathlib
 import shutil
 import string
+import tempfile
 
 import click
 
@@ -29,6 +31,43 @@ def ensure_tmp_dir(path):
     return p
 
 
+ASKPASS_SCRIPT = """#!/bin/sh
+case "$1" in
+    Username*) echo "$EXPORTER_GIT_USERNAME" ;;
+    *) echo "$EXPORTER_GIT_PASSWORD" ;;
+esac
+"""
+
+
+def git_askpass_env(script_dir, username, password):
+    """
+    Create environment variables for git authentication, so credentials don't have to be part of remote url.
+    Credentials are passed only through environment to the askpass script created inside given directory,
+    credential helpers configured by the user are disabled so they can't answer with different account.
+
+    :param script_dir: directory to create askpass script in, if it isn't already there
+    :param username: username answered to git username prompt
+    :param password: password answered to git password prompt
+    :return: dictionary of environment variables for git commands
+    """
+    path = pathlib.Path(script_dir) / 'askpass.sh'
+    if not path.exists():
+        with tempfile.NamedTemporaryFile('w', dir=script_dir, delete=False) as f:
+            f.write(ASKPASS_SCRIPT)
+        os.chmod(f.name, 0o700)
+        os.replace(f.name, path)  # atomic, concurrent tasks never see partially written script
+    return {
+        'GIT_ASKPASS': str(path.absolute()),
+        'GIT_TERMINAL_PROMPT': '0',
+        # git asks configured credential helpers before askpass, reset them as `-c credential.helper=` would
+        'GIT_CONFIG_COUNT': '1',
+        'GIT_CONFIG_KEY_0': 'credential.helper',
+        'GIT_CONFIG_VALUE_0': '',
+        'EXPORTER_GIT_USERNAME': username,
+        'EXPORTER_GIT_PASSWORD': password,
+    }
+
+
 # credit to Carl F.:  https://stackoverflow.com/a/8290508/6784881
 def split_to_batches(iterable, n=1):
     """Split iterable to batched of given size"""
@@ -41,6 +80,5 @@ def flatten(t):
     """Flatten list of lists"""
     flat_list = []
     for sublist in t:
-        for item in sublist:
-            flat_list.append(item)
+        flat_list.extend(sublist)
     return flat_list
@@ -0,0 +1,158 @@
+import json
+import socket
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+from flexmock import flexmock
+
+from exporter.logic import GitHubClient, GitLabClient, _build_session
+
+
+def fake_response(body, links=None, headers=None):
+    return flexmock(
+        links=links or {},
+        headers=headers or {},
+        raise_for_status=lambda: None,
+        json=lambda: body,
+        content=json.dumps(body).encode()
+    )
+
+
+class FakeSession:
+    """Session returning one JSON item per page of the paginated resource"""
+
+    def __init__(self, pages, last_link=True, total_pages_header=False):
+        self.pages = pages
+        self.last_link = last_link
+        self.total_pages_header = total_pages_header
+        self.requested = []
+        self.lock = threading.Lock()
+        self.headers = {}
+        self.auth = None
+
+    def get(self, url, params=None):
+        with self.lock:
+            self.requested.append(url)
+        page = int(parse_qs(urlsplit(url).query).get('page', ['1'])[0])
+        links = {}
+        if page < self.pages:
+            links['next'] = {'url': f'https://example.com/items?per_page=1&page={page + 1}'}
+            if self.last_link:
+                links['last'] = {'url': f'https://example.com/items?per_page=1&page={self.pages}'}
+        headers = {'X-Total-Pages': str(self.pages)} if self.total_pages_header else {}
+        return fake_response([page], links, headers)
+
+
+@pytest.mark.parametrize('client_cls', [GitHubClient, GitLabClient])
+@pytest.mark.parametrize('last_link', [True, False])
+def test_all_pages_are_fetched_in_order(client_cls, last_link):
+    """Items from all pages should be returned in page order, regardless of how they were fetched"""
+
+    session = FakeSession(pages=20, last_link=last_link)
+    client = client_cls('XXX', session=session, concurrent_pages=4)
+    assert list(client._iter_pages('https://example.com/items')) == list(range(1, 21))
+    assert len(session.requested) == 20
+
+
+def test_single_page_is_fetched_once():
+    """Resource without pagination links should be fetched exactly once"""
+
+    session = FakeSession(pages=1)
+    client = GitHubClient('XXX', session=session)
+    assert list(client._iter_pages('https://example.com/items')) == [1]
+    assert len(session.requested) == 1
+
+
+def test_pages_are_not_fetched_until_needed():
+    """Following pages should not be requested when the caller stops iterating over the first page"""
+
+    session = FakeSession(pages=20, last_link=False)
+    client = GitLabClient('XXX', session=session)
+    assert next(client._iter_pages('https://example.com/items')) == 1
+    assert len(session.requested) == 1
+
+
+def test_limited_search_issues_single_request():
+    """Search limited to few projects should not walk through the following pages"""
+
+    session = FakeSession(pages=20)
+    client = GitLabClient('XXX', session=session)
+    assert client.search_owned_projects('TEST', limit=2) == [1]
+    assert len(session.requested) == 1
+
+
+def test_user_is_fetched_once_for_all_clones():
+    """Login read concurrently by many clones of the same client should cost single request"""
+
+    session = flexmock(headers={}, auth=None)
+    session.should_receive('get').and_return(fake_response({'login': 'YYY'})).once()
+    client = GitHubClient('XXX', session=session)
+    clones = [client.clone() for _ in range(10)]
+    logins = []
+    threads = [threading.Thread(target=lambda c=c: logins.append(c.login)) for c in clones]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert logins == ['YYY'] * 10
+    assert client.login == 'YYY'
+
+
+def test_repo_names_are_fetched_once_for_all_clones():
+    """Repository names should be listed once and then answered from memory"""
+
+    session = flexmock(headers={}, auth=None)
+    session.should_receive('get').and_return(fake_response([{'name': 'A'}, {'name': 'b'}])).once()
+    client = GitHubClient('XXX', session=session)
+    assert client.repo_names() == {'a', 'b'}
+    assert client.clone().repo_names() == {'a', 'b'}
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_is_decoded_with_and_without_orjson(use_orjson, monkeypatch):
+    """Decoded responses should be the same whether the optional orjson is used or not"""
+
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr('exporter.logic.orjson', None)
+    session = FakeSession(pages=3)
+    client = GitHubClient('XXX', session=session)
+    assert list(client._iter_pages('https://example.com/items')) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('api', [GitHubClient.API, GitLabClient.API])
+def test_pooled_connections_use_tcp_keepalive(api):
+    """Connections to both APIs should keep Nagle disabled and send keepalive probes"""
+
+    adapter = _build_session().get_adapter(api)
+    socket_options = adapter.poolmanager.connection_pool_kw['socket_options']
+    assert (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) in socket_options
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in socket_options
+
+
+def test_total_pages_header_is_used_without_walking_next_links():
+    """GitLab X-Total-Pages header should be enough to request all the remaining pages at once"""
+
+    session = FakeSession(pages=20, last_link=False, total_pages_header=True)
+    first_page = session.get
+
+    def get(url, params=None):
+        r = first_page(url, params)
+        if url != 'https://example.com/items':
+            r.links = {}  # next links of following pages must not be needed
+        return r
+
+    session.get = get
+    client = GitLabClient('XXX', session=session, concurrent_pages=4)
+    assert list(client._iter_pages('https://example.com/items')) == list(range(1, 21))
+    assert len(session.requested) == 20
+
+
+def test_exhausted_retries_return_last_response():
+    """Last failed response should reach raise_for_status instead of being turned into RetryError"""
+
+    retries = _build_session().get_adapter(GitHubClient.API).max_retries
+    assert 503 in retries.status_forcelist
+    assert not retries.raise_on_status
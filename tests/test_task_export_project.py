@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 from flexmock import flexmock
 
@@ -14,6 +17,7 @@ def github():
         token='XXX',
         login='YYY',
         repo_exists=blank_fn,
+        repo_names=lambda: frozenset(),
         delete_repo=blank_fn,
     )
 
@@ -56,7 +60,7 @@ def test_if_run_is_skipped_when_repo_exists_and_policy_is_skip(instance, monkeyp
     """When conflict policy is set to 'skip' and GitHub project already exists, run should skipped"""
 
     instance.conflict_policy = 'skip'
-    monkeypatch.setattr(instance.github, 'repo_exists', lambda x, y: True)
+    monkeypatch.setattr(instance.github, 'repo_names', lambda: frozenset([instance.name_github.lower()]))
     instance.run()
     assert not instance.running
     assert len(instance.subtasks) == 0
@@ -69,11 +73,11 @@ def test_if_overwrite_happens_when_repo_exists_and_policy_is_overwrite(instance,
     """When conflict policy is set to 'overwrite' and GitHub project already exists, it should be overwritten"""
 
     instance.conflict_policy = 'overwrite'
-    monkeypatch.setattr(instance.github, 'repo_exists', lambda x, y: True)
+    monkeypatch.setattr(instance.github, 'repo_names', lambda: frozenset([instance.name_github.lower()]))
     monkeypatch.setattr(instance.github, 'delete_repo', lambda x, y: None)
     flexmock(instance.github).should_receive("delete_repo").once()
-    flexmock(TaskFetchGitlabProject, run=lambda: None)
-    flexmock(TaskPushToGitHub, run=lambda: None)
+    flexmock(TaskFetchGitlabProject, search=lambda: None, clone=lambda x: None, fetch_lfs=lambda x, y: None)
+    flexmock(TaskPushToGitHub, create_repo=lambda: None, push=lambda: None)
     instance.run()
     assert not instance.running
     assert len(instance.subtasks) == 2
@@ -123,9 +127,96 @@ def test_rollback_error_is_detected(instance, monkeypatch):
 def test_subtasks_are_added_to_subtask_list(instance, monkeypatch):
     """Successful export always consists of two tasks"""
 
-    flexmock(TaskFetchGitlabProject, run=lambda: None)
-    flexmock(TaskPushToGitHub, run=lambda: None)
-    monkeypatch.setattr(instance.github, 'repo_exists', lambda x, y: False)
+    flexmock(TaskFetchGitlabProject, search=lambda: None, clone=lambda x: None, fetch_lfs=lambda x, y: None)
+    flexmock(TaskPushToGitHub, create_repo=lambda: None, push=lambda: None)
     instance.run()
     assert len(instance.subtasks) == 2
     assert TaskExportProject.SUCCESS in instance.status
+
+
+def test_created_repo_is_deleted_when_fetch_fails(instance, monkeypatch):
+    """GitHub repository created while the GitLab project is being fetched should be deleted if the fetch fails"""
+
+    def raise_(*args, **kwargs):
+        raise Exception('ABC')
+
+    flexmock(TaskFetchGitlabProject, search=lambda: None, clone=raise_)
+    flexmock(TaskPushToGitHub, create_repo=lambda: None, push=lambda: None)
+    flexmock(instance.github).should_receive('delete_repo').once()
+    with pytest.raises(Exception, match='ABC'):
+        instance.run()
+    assert TaskExportProject.ERROR in instance.status
+    assert TaskExportProject.SUCCESS not in instance.status
+
+
+def test_lfs_files_are_not_fetched_when_repo_creation_fails(instance, monkeypatch):
+    """Failed creation of the GitHub repository should stop the export before the LFS files are fetched"""
+
+    created = threading.Event()
+
+    def create_repo():
+        created.set()
+        raise Exception('CREATE')
+
+    def clone(json):
+        created.wait(5)
+        time.sleep(0.1)  # let the executor mark the future as failed
+
+    flexmock(TaskFetchGitlabProject, search=lambda: None, clone=clone)
+    flexmock(TaskFetchGitlabProject).should_receive('fetch_lfs').never()
+    flexmock(TaskPushToGitHub, create_repo=create_repo, push=lambda: None)
+    flexmock(instance.github).should_receive('delete_repo').never()
+    with pytest.raises(Exception, match='CREATE'):
+        instance.run()
+    assert TaskExportProject.ERROR in instance.status
+
+
+def test_fetch_error_is_reported_when_deleting_created_repo_fails(instance, monkeypatch):
+    """Failed cleanup of the created GitHub repository must not hide the reason why fetch failed"""
+
+    def raise_(*args, **kwargs):
+        raise Exception('ABC')
+
+    def raise_delete(*args, **kwargs):
+        raise Exception('DELETE')
+
+    flexmock(TaskFetchGitlabProject, search=lambda: None, clone=raise_)
+    flexmock(TaskPushToGitHub, create_repo=lambda: None, push=lambda: None)
+    monkeypatch.setattr(instance.github, 'delete_repo', raise_delete)
+    with pytest.raises(Exception, match='ABC'):
+        instance.run()
+    assert len(instance.exc) == 1
+    assert str(instance.exc[0]) == 'ABC'
+
+
+def test_rollback_of_not_started_task_doesnt_delete_existing_repo(instance, monkeypatch):
+    """Task cancelled before it ran doesn't know whether the repository existed, it must not delete it"""
+
+    monkeypatch.setattr(instance.github, 'repo_exists', lambda x, y: True)
+    flexmock(instance.github).should_receive('delete_repo').never()
+    instance.rollback()
+    assert TaskExportProject.ROLLBACKED not in instance.status
+
+
+@pytest.mark.parametrize('existing_name', ['test_github', 'Test_GitHub', 'TEST_GITHUB'])
+def test_existing_repo_is_detected_case_insensitively(instance, monkeypatch, existing_name):
+    """GitHub repository names are case-insensitive, differently cased existing repo must be skipped"""
+
+    instance.conflict_policy = 'skip'
+    monkeypatch.setattr(instance.github, 'repo_names', lambda: frozenset([existing_name.lower()]))
+    instance.run()
+    assert TaskExportProject.SKIPPED in instance.status
+    assert len(instance.subtasks) == 0
+
+
+def test_rollback_doesnt_delete_differently_cased_existing_repo(instance, monkeypatch):
+    """Rollback must not delete repository which existed before export under differently cased name"""
+
+    instance.conflict_policy = 'skip'
+    monkeypatch.setattr(instance.github, 'repo_names', lambda: frozenset(['test_github']))
+    monkeypatch.setattr(instance.github, 'repo_exists', lambda x, y: True)
+    flexmock(instance.github).should_receive('delete_repo').never()
+    instance.run()
+    instance.rollback()
+    assert instance.github_repo_existed
+    assert TaskExportProject.ROLLBACKED in instance.status
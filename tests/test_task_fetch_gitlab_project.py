@@ -13,10 +13,14 @@ SEARCH_OWNED_PROJECTS_RESPONSE = [
 ]
 
 
+def fake_search(*args, **kwargs):
+    return SEARCH_OWNED_PROJECTS_RESPONSE
+
+
 @pytest.fixture()
 def gitlab():
     return flexmock(
-        search_owned_projects=lambda: SEARCH_OWNED_PROJECTS,
+        search_owned_projects=fake_search,
         token='XXX'
     )
 
@@ -49,7 +53,7 @@ def test_multiple_gitlab_projects_exist_raises_exception(instance, monkeypatch):
     """Can't choose between multiple GitLab projects matching given name"""
 
     with pytest.raises(MultipleGitLabProjectsExistException, match=r'Multiple projects found for *'):
-        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', lambda x: [1, 2])
+        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', lambda x, limit=None: [1, 2])
         instance.run()
 
 
@@ -57,18 +61,18 @@ def test_no_gitlab_project_exist_raises_exception(instance, monkeypatch):
     """Can't export non-existing GitLab project"""
 
     with pytest.raises(NoGitLabProjectsExistException, match=r'No project found for *'):
-        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', lambda x: [])
+        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', lambda x, limit=None: [])
         instance.run()
 
 
 def test_error_during_cloning_gitlab_repo_raises_exception_and_sets_flags(instance, monkeypatch):
     """Test flags and state after errors raised by cloning GitLab project"""
 
-    def raise_(*args):
+    def raise_(*args, **kwargs):
         raise Exception('ABC')
 
     with pytest.raises(Exception, match='ABC'):
-        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', lambda x: SEARCH_OWNED_PROJECTS_RESPONSE)
+        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', fake_search)
         monkeypatch.setattr(git.Repo, 'clone_from', raise_)
         instance.suppress_exceptions = False
         instance.run()
@@ -81,21 +85,81 @@ def test_error_during_cloning_gitlab_repo_raises_exception_and_sets_flags(instan
 def test_error_during_git_lfs_cloning(instance, monkeypatch):
     """Test flags and state after errors raised by fetching additional files using git LFS"""
 
-    def raise_(*args):
+    def raise_(*args, **kwargs):
         raise Exception('ABC')
 
-    def fake_repo(*args):
+    def fake_repo(*args, **kwargs):
         return flexmock(
-            working_dir='directory'
+            working_dir='directory',
+            git=flexmock(execute=raise_)
         )
 
     with pytest.raises(Exception, match='ABC'):
-        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', lambda x: SEARCH_OWNED_PROJECTS_RESPONSE)
+        monkeypatch.setattr(instance.gitlab, 'search_owned_projects', fake_search)
         monkeypatch.setattr(git.Repo, 'clone_from', fake_repo)
-        monkeypatch.setattr(git.cmd.Git, 'execute', raise_)
         instance.suppress_exceptions = False
         instance.run()
 
     assert not instance.running
     assert len(instance.exc) == 1
     assert str(instance.exc[0]) == 'ABC'
+
+
+def test_git_lfs_fetch_uses_configured_concurrency(instance, monkeypatch):
+    """LFS files should be fetched with configured count of concurrent transfers"""
+
+    executed = []
+
+    def fake_repo(*args, **kwargs):
+        return flexmock(
+            working_dir='directory',
+            git=flexmock(execute=lambda cmd, env: executed.append(cmd))
+        )
+
+    monkeypatch.setattr(instance.gitlab, 'search_owned_projects', fake_search)
+    monkeypatch.setattr(git.Repo, 'clone_from', fake_repo)
+    instance.lfs_concurrent_transfers = 16
+    instance.run()
+
+    assert len(executed) == 1
+    assert 'lfs.concurrenttransfers=16' in executed[0]
+    assert executed[0][-3:] == ['lfs', 'fetch', '--all']
+
+
+def test_credentials_are_not_part_of_clone_url(instance, monkeypatch):
+    """GitLab token should be passed to git through environment, not through the cloned url"""
+
+    cloned = {}
+
+    def fake_repo(url, path, **kwargs):
+        cloned.update(url=url, **kwargs)
+        raise Exception('ABC')
+
+    monkeypatch.setattr(instance.gitlab, 'search_owned_projects', fake_search)
+    monkeypatch.setattr(git.Repo, 'clone_from', fake_repo)
+    with pytest.raises(Exception, match='ABC'):
+        instance.run()
+
+    assert cloned['url'] == SEARCH_OWNED_PROJECTS_RESPONSE[0]['http_url_to_repo']
+    assert instance.gitlab.token not in cloned['url']
+    assert cloned['env']['EXPORTER_GIT_PASSWORD'] == instance.gitlab.token
+    assert cloned['env']['GIT_CONFIG_KEY_0'] == 'credential.helper'
+    assert cloned['env']['GIT_CONFIG_VALUE_0'] == ''
+    assert (instance.base_dir / 'askpass.sh').exists()
+
+
+def test_gitlab_project_is_cloned_without_working_tree(instance, monkeypatch):
+    """Project is only pushed further, so it should be cloned as bare repository"""
+
+    cloned = {}
+
+    def fake_repo(url, path, **kwargs):
+        cloned.update(kwargs)
+        raise Exception('ABC')
+
+    monkeypatch.setattr(instance.gitlab, 'search_owned_projects', fake_search)
+    monkeypatch.setattr(git.Repo, 'clone_from', fake_repo)
+    with pytest.raises(Exception, match='ABC'):
+        instance.run()
+
+    assert cloned['bare']
@@ -33,8 +33,7 @@ def bar():
 def instance(github, bar, tmp_path):
     return TaskPushToGitHub(
         github=github,
-        git_cmd=flexmock(create_remote=lambda: None, rev_list=lambda: None,
-                         git=flexmock(rev_list=lambda: None)),
+        git_cmd=flexmock(git_dir=tmp_path, git=flexmock(rev_list=lambda: None, execute=blank_fn)),
         name_github='TEST',
         is_private=False,
         bar=bar,
@@ -62,12 +61,23 @@ def test_error_during_creating_github_repo(instance, monkeypatch):
 def test_push_happens_when_fetched_repo_has_commits(instance, monkeypatch):
     """Test if push is called when repository is correctly fetched and contains at least one commit"""
 
-    fake_remote = flexmock(push=lambda: None)
-    monkeypatch.setattr(instance.git_cmd, 'create_remote', fake_remote)
+    pushed = []
+    envs = []
+
+    def fake_execute(cmd, env):
+        pushed.append(cmd)
+        envs.append(env)
+
     monkeypatch.setattr(instance.git_cmd.git, 'rev_list', lambda x, y: 1)
-    flexmock(fake_remote).should_receive("push").once()
+    monkeypatch.setattr(instance.git_cmd.git, 'execute', fake_execute)
     instance.run()
     assert not instance.running
+    assert all(env['GIT_CONFIG_KEY_0'] == 'credential.helper' for env in envs)
+    assert all(env['GIT_CONFIG_VALUE_0'] == '' for env in envs)
+    assert len(pushed) == 2
+    assert pushed[0][:3] == ['git', 'push', '--mirror']
+    assert instance.github.token not in pushed[0][3]
+    assert pushed[1] == ['git', 'lfs', 'push', '--all', pushed[0][3]]
 
 
 def test_push_doesnt_happen_when_fetched_repo_has_zero_commits(instance, monkeypatch):
@@ -76,8 +86,7 @@ def test_push_doesnt_happen_when_fetched_repo_has_zero_commits(instance, monkeyp
     def raise_(*args, **kwargs):
         raise Exception()
 
-    fake_remote = flexmock(push=raise_)
-    monkeypatch.setattr(instance.git_cmd, 'create_remote', fake_remote)
     monkeypatch.setattr(instance.git_cmd.git, 'rev_list', lambda x, y: 0)
+    monkeypatch.setattr(instance.git_cmd.git, 'execute', raise_)
     instance.run()
     assert not instance.running